@@ -0,0 +1,5 @@
+"""Allow `python -m jplearning`."""
+
+from jplearning.cli import main
+
+main()
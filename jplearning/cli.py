@@ -0,0 +1,182 @@
+"""Command-line entry point, e.g. `jplearning build-corpus`.
+
+Heavy dependencies (pandas, MeCab, pykakasi, wanikani_api) are only
+imported inside stage functions, so `--help` and cached runs stay fast.
+"""
+
+import argparse
+import os
+import runpy
+import shutil
+from pathlib import Path
+
+import jplearning as jpl
+from jplearning.constants import SYNC_TTL
+from jplearning.pipeline import Pipeline, Stage
+
+PKG_DIR = Path(__file__).parent
+DECKS = ["misa_anki.csv", "misa_words.csv", "jp_anki.csv"]
+
+
+def sync_wanikani(sync_vocab=False):
+    """Fetch wanikani SRS stages into known_kanji.json."""
+    import jplearning.helpers as jph
+
+    jph.get_known_kanji(os.getenv("WANIKANI"), sync=True, sync_vocab=sync_vocab)
+
+
+def sync_bunpro():
+    """Fetch bunpro grammar points into grammar_points.json."""
+    import jplearning.helpers as jph
+
+    jph.get_grammar_points(os.getenv("BUNPRO"), sync=True)
+
+
+def build_corpus():
+    """Build deduplicated, compact sentence corpus parquet."""
+    import jplearning.helpers as jph
+
+    jph.get_corpus(rebuild=True)
+
+
+def misa():
+    """Build Misa anki deck, see misa.py."""
+    runpy.run_module("jplearning.misa", run_name="__main__")
+
+
+def bunpro():
+    """Build Bunpro anki deck from the cached corpus, see main.py."""
+    runpy.run_module("jplearning.main", run_name="__main__")
+
+
+def export(dest=None):
+    """Copy anki decks from storage/outputs to dest."""
+    if dest:
+        for deck in DECKS:
+            shutil.copy(jpl.outputs_dir() / deck, jpl.get_dir(Path(dest)) / deck)
+
+
+def get_pipeline(args) -> Pipeline:
+    """Define stages for the cli.
+
+    Remote state (SRS stages, bunpro grammar points) is fetched by the sync
+    stages into json files that the deck stages take as inputs. Those files
+    are only rewritten when their content changes, so a refetch with no
+    remote changes leaves the decks cached.
+    """
+    ext = jpl.external_dir()
+    kanji = ext / "wanikani/kanji.parquet"
+    known_kanji = ext / "wanikani/known_kanji.json"
+    grammar_points = ext / "bunpro/grammar_points.json"
+    corpus = jpl.processed_dir() / "sentence_db.parquet"
+    code = [PKG_DIR / i for i in ["helpers.py", "constants.py", "dedupe.py"]]
+    pl = Pipeline()
+    pl.add(
+        Stage(
+            "sync-wanikani",
+            lambda: sync_wanikani(sync_vocab=args.command == "sync"),
+            outputs=[kanji, known_kanji],
+            ttl=SYNC_TTL,
+        )
+    )
+    pl.add(Stage("sync-bunpro", sync_bunpro, outputs=[grammar_points], ttl=SYNC_TTL))
+    pl.add(Stage("sync", lambda: None, deps=["sync-wanikani", "sync-bunpro"]))
+    pl.add(
+        Stage(
+            "build-corpus",
+            build_corpus,
+            inputs=[
+                ext / "bunpro/core6k.txt",
+                ext / "bunpro/jomako.csv",
+                ext / "bunpro/tatoeba_*",
+                ext / "bunpro/sentence_grammar_mappings.csv",
+                PKG_DIR / "compact.py",
+            ]
+            + code,
+            outputs=[corpus],
+        )
+    )
+    pl.add(
+        Stage(
+            "misa",
+            misa,
+            inputs=[
+                ext / "misa/*.csv",
+                ext / "custom_*.csv",
+                kanji,
+                known_kanji,
+                PKG_DIR / "misa.py",
+            ]
+            + code,
+            outputs=[
+                jpl.outputs_dir() / "misa_anki.csv",
+                jpl.outputs_dir() / "misa_words.csv",
+                jpl.interim_dir() / "no_custom_word_meaning.csv",
+                jpl.interim_dir() / "auto_mappings.csv",
+            ],
+            deps=["sync-wanikani"],
+        )
+    )
+    pl.add(
+        Stage(
+            "bunpro",
+            bunpro,
+            inputs=[
+                ext / "bunpro/bunpro.txt",
+                ext / "bunpro/sentence_grammar_mappings.csv",
+                known_kanji,
+                grammar_points,
+                corpus,
+                PKG_DIR / "main.py",
+                PKG_DIR / "compact.py",
+            ]
+            + code,
+            outputs=[jpl.outputs_dir() / "jp_anki.csv"],
+            deps=["sync-wanikani", "sync-bunpro", "build-corpus"],
+        )
+    )
+    dest = getattr(args, "dest", None)
+    pl.add(
+        Stage(
+            "export",
+            lambda: export(dest),
+            inputs=[jpl.outputs_dir() / i for i in DECKS],
+            outputs=[Path(dest) / i for i in DECKS] if dest else [],
+            deps=["misa", "bunpro"],
+            params={"dest": str(dest)},
+        )
+    )
+    return pl
+
+
+def main(argv=None):
+    """Run cli."""
+    parser = argparse.ArgumentParser(
+        prog="jplearning", description="Build Japanese Anki decks."
+    )
+    parser.add_argument(
+        "-f", "--force", action="store_true", help="rerun stages even if unchanged"
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="less output")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser(
+        "sync", help="fetch wanikani kanji and bunpro reviews ($WANIKANI, $BUNPRO)"
+    )
+    sub.add_parser("build-corpus", help="build deduplicated sentence corpus")
+    sub.add_parser("misa", help="build Misa anki deck (needs $WANIKANI)")
+    sub.add_parser("bunpro", help="build Bunpro anki deck (needs $WANIKANI, $BUNPRO)")
+    export_parser = sub.add_parser("export", help="build and export all decks")
+    export_parser.add_argument("--dest", help="directory to copy decks into")
+    args = parser.parse_args(argv)
+
+    pl = get_pipeline(args)
+    stages = pl.order(args.command)
+    force = set(stages) if args.force or args.command == "sync" else set()
+    pl.run(args.command, force=force, verbose=0 if args.quiet else 1)
+    if args.command == "export" and not args.quiet:
+        for deck in DECKS:
+            print(Path(args.dest or jpl.outputs_dir()) / deck)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Memory-compact arrow/categorical representations of sentence and vocab DFs."""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from jplearning.constants import KANJI_PATTERN
+
+STRING = pd.ArrowDtype(pa.string())
+STRING_LIST = pd.ArrowDtype(pa.list_(pa.string()))
+KANJI_IDS = pd.ArrowDtype(pa.list_(pa.int32()))
+
+
+def kanji_ids(kanjis) -> list:
+    """Convert kanji to integer ids (unicode codepoints).
+
+    Example:
+    kanji_ids({'板', '寝'})
+    >>> [23997, 26495]
+    """
+    return sorted({ord(k) for k in kanjis})
+
+
+def kanji_from_ids(ids) -> set:
+    """Convert integer ids from kanji_ids() back to a set of kanji."""
+    return {chr(i) for i in ids}
+
+
+def to_kanji_ids(used_kanji: pd.Series) -> pd.Series:
+    """Convert a series of kanji sets to an arrow list<int32> series."""
+    arr = pa.array(
+        [kanji_ids(i) if hasattr(i, "__iter__") else [] for i in used_kanji],
+        type=pa.list_(pa.int32()),
+    )
+    return pd.Series(arr, index=used_kanji.index, dtype=KANJI_IDS)
+
+
+def known_kanji_mask(used_kanji: pd.Series, known_kanji: set) -> pd.Series:
+    """Check whether each row only uses known kanji.
+
+    Works on both set columns and list<int32> columns from to_kanji_ids().
+    The arrow path is vectorised over the flattened kanji ids.
+
+    Args:
+        used_kanji (pandas series): Kanji used in each sentence
+        known_kanji (set): Set of known kanji
+
+    Returns:
+        [pandas series]: Boolean mask
+    """
+    if used_kanji.dtype != KANJI_IDS:
+        return used_kanji.apply(lambda x: set(x).issubset(known_kanji))
+    arr = pa.array(used_kanji.array)
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    unknown = pc.invert(
+        pc.is_in(pc.list_flatten(arr), pa.array(kanji_ids(known_kanji), pa.int32()))
+    )
+    rows = pc.list_parent_indices(arr).to_numpy()
+    counts = np.bincount(
+        rows[unknown.to_numpy(zero_copy_only=False)], minlength=len(used_kanji)
+    )
+    return pd.Series(counts == 0, index=used_kanji.index)
+
+
+def compact_df(
+    df: pd.DataFrame,
+    strings: list = [],
+    categories: list = [],
+    lists: list = [],
+    kanji: list = [],
+) -> pd.DataFrame:
+    """Convert selected object columns of a DF to compact dtypes.
+
+    Columns missing from df are ignored.
+
+    Args:
+        df (pandas df): DF to convert, left unmodified
+        strings (list, optional): Columns to store as arrow strings.
+        categories (list, optional): Repeated string columns to store as category.
+        lists (list, optional): List columns to store as arrow list<string>.
+        kanji (list, optional): Kanji set columns to store as list<int32> ids.
+
+    Returns:
+        [pandas df]: Compact copy of df
+    """
+    df = df.copy()
+    for col in strings:
+        if col in df:
+            df[col] = df[col].astype(STRING)
+    for col in categories:
+        if col in df:
+            df[col] = df[col].astype("category")
+    for col in lists:
+        if col in df:
+            df[col] = (
+                df[col].apply(lambda x: list(x) if len(x) else []).astype(STRING_LIST)
+            )
+    for col in kanji:
+        if col in df and df[col].dtype != KANJI_IDS:
+            df[col] = to_kanji_ids(df[col])
+    return df
+
+
+def compact_sentence_db(df: pd.DataFrame) -> pd.DataFrame:
+    """Compact DF returned from get_sentence_db() or bunpro.txt.
+
+    Adds used_kanji from jp if missing, so it is built as list<int32> ids
+    directly rather than as python sets.
+
+    Most of the saving is in used_kanji. On core6k + jomako the result is
+    5.9x smaller than get_sentence_db() plus a used_kanji set column when
+    strings are python objects (pandas < 3), but only 4.3x under pandas 3,
+    whose strings are already arrow-backed. Against get_sentence_db() alone
+    the gain is 2.6x and 1.06x respectively: jp and eng are mostly unique,
+    so dictionary encoding them would not shrink them.
+    """
+    if "jp" in df and "used_kanji" not in df:
+        df = df.assign(used_kanji=df.jp.str.findall(KANJI_PATTERN))
+    return compact_df(
+        df,
+        strings=["jp", "eng", "hira", "roman"],
+        categories=["source", "grammar", "tags"],
+        kanji=["used_kanji"],
+    )
+
+
+def compact_vocab_df(df: pd.DataFrame) -> pd.DataFrame:
+    """Compact DF returned from get_vocab_df()."""
+    df = compact_df(df, strings=["characters"], lists=["meanings", "readings", "pos"])
+    df["subject_id"] = df.subject_id.astype("int32")
+    df["srs_stage"] = df.srs_stage.astype("int8")
+    return df
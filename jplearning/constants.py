@@ -1,3 +1,5 @@
+KANJI_PATTERN = "[\u3400-\u4db5\u4e00-\u9fcb\uf900-\ufa6a]"
+
 COLORS = [
     (235, 172, 35),
     (184, 0, 88),
@@ -27,3 +29,12 @@ ALL_POS = [
     "adj",
     "end",
 ]
+
+SOURCE_PRIORITY = [
+    "core6k",
+    "jomako",
+    "tatoeba",
+]
+
+# SRS stages and bunpro reviews change remotely, so refetch after an hour
+SYNC_TTL = 60 * 60
@@ -0,0 +1,118 @@
+"""Near-duplicate sentence detection.
+
+Sentences are near-duplicates when they are equal after normalize_sentence(),
+i.e. they only differ by punctuation, spacing, full-width forms, html or
+furigana. Examples are doctests: python -m doctest jplearning/dedupe.py
+"""
+
+import re
+import unicodedata
+
+import pandas as pd
+
+from jplearning.constants import KANJI_PATTERN, SOURCE_PRIORITY
+
+# Hiragana-only brackets are furigana, e.g. 今[いま] or 私(わたし)
+_FURIGANA = re.compile(r"[\[(][ぁ-ゖー]+[\])]")
+
+
+def normalize_sentence(text) -> str:
+    """Normalise a japanese sentence for near-duplicate comparison.
+
+    Strips html tags and furigana, applies NFKC (full-width characters and
+    spaces become their half-width forms), then removes whitespace and
+    punctuation. Only hiragana-only brackets count as furigana, so other
+    bracketed words, like the names in jomako lines, are kept.
+
+    Example:
+    >>> normalize_sentence("今[いま]まで　お世話になりました。")
+    '今までお世話になりました'
+    >>> normalize_sentence("これは(ペン)です")
+    'これはペンです'
+    """
+    if not isinstance(text, str):
+        return ""
+    text = re.sub("\\<(.*?)\\>", "", text)
+    text = unicodedata.normalize("NFKC", text)
+    text = _FURIGANA.sub("", text)
+    return "".join(
+        ch
+        for ch in text
+        if not ch.isspace() and unicodedata.category(ch)[0] not in ("P", "S")
+    )
+
+
+def cluster_sentences(sentences: list) -> list:
+    """Assign a cluster id to each sentence so near-duplicates share an id.
+
+    Example:
+    >>> cluster_sentences(["待って！", "待って。", "待って", "待ってよ"])
+    [0, 0, 0, 3]
+
+    Args:
+        sentences (list): Japanese sentences
+
+    Returns:
+        [list]: Cluster id (index of the first member) for each sentence.
+            Sentences that normalise to "" each get their own cluster.
+    """
+    first = {}
+    clusters = []
+    for i, sentence in enumerate(sentences):
+        norm = normalize_sentence(sentence)
+        clusters.append(first.setdefault(norm, i) if norm else i)
+    return clusters
+
+
+def dedupe_sentences(
+    df: pd.DataFrame, priority: list = SOURCE_PRIORITY, keep: set = set()
+) -> pd.DataFrame:
+    """Drop near-duplicate sentences, keeping the best row per cluster.
+
+    The best row comes from the most preferred source, then has the fewest
+    kanji, then is the shortest, so it is never harder to learn than a
+    dropped row from the same source.
+
+    Example:
+    >>> df = pd.DataFrame(
+    ...     {
+    ...         "jp": ["今[いま]まで　お世話になりました。", "今までお世話になりました",
+    ...                "これじゃない", "これじゃないよ"],
+    ...         "source": ["jomako", "core6k", "jomako", "jomako"],
+    ...     }
+    ... )
+    >>> dedupe_sentences(df).jp.tolist()
+    ['今までお世話になりました', 'これじゃない', 'これじゃないよ']
+
+    Args:
+        df (pandas df): DF with jp and source columns, e.g. get_sentence_db()
+        priority (list, optional): Preferred sources, best first.
+            Defaults to SOURCE_PRIORITY.
+        keep (set, optional): jp sentences that are never dropped, e.g. those
+            in sentence_grammar_mappings.csv. Defaults to set().
+
+    Returns:
+        [pandas df]: Deduplicated DF, in original order
+    """
+    df = df.reset_index(drop=True)
+    rank = {s: it for it, s in enumerate(priority)}
+    jp = [i if isinstance(i, str) else "" for i in df.jp]
+    keys = pd.DataFrame(
+        {
+            "cluster": cluster_sentences(jp),
+            "keep": df.jp.isin(keep).to_numpy(),
+            "rank": [rank.get(s, len(rank)) for s in df.source],
+            "kanji": [len(re.findall(KANJI_PATTERN, i)) for i in jp],
+            "length": [len(i) for i in jp],
+            "jp": jp,
+        }
+    ).sort_values(
+        ["keep", "rank", "kanji", "length"],
+        ascending=[False, True, True, True],
+        kind="stable",
+    )
+    best = keys.groupby("cluster").head(1)
+    # Exact copies of a kept sentence still collapse to one row
+    kept = keys[keys.keep].drop_duplicates("jp")
+    index = sorted(set(best.index) | set(kept.index))
+    return df.loc[index].reset_index(drop=True)
@@ -2,6 +2,7 @@
 import json
 import os
 import re
+import time
 from typing import List
 
 import MeCab
@@ -12,7 +13,8 @@ from tqdm import tqdm
 from wanikani_api.client import Client
 
 import jplearning as jpl
-from jplearning.constants import ALL_POS
+from jplearning.constants import ALL_POS, KANJI_PATTERN, SYNC_TTL
+from jplearning.dedupe import dedupe_sentences
 
 tqdm.pandas()
 
@@ -53,7 +55,7 @@ def remove_unicode_block(unicode_block, string):
 
 def get_kanji(text):
     """Get Kanji from text."""
-    return extract_unicode_block(r"[㐀-䶵一-鿋豈-頻]", text)
+    return extract_unicode_block(KANJI_PATTERN, text)
 
 
 def get_katakana(text):
@@ -79,7 +81,7 @@ def rm_html_apply_rks(text):
     return read_kanji_sentence(text)
 
 
-def get_vocab_df(api_key, sync_vocab=False, type="kanji"):
+def get_vocab_df(api_key, sync_vocab=False, type="kanji", compact=False):
     """Get vocab dataframe.
 
     Example:
@@ -93,6 +95,8 @@ def get_vocab_df(api_key, sync_vocab=False, type="kanji"):
     Args:
         api_key (str): wanikani api key
         sync_vocab (bool, optional): Fetch and cache vocab. Defaults to False.
+        compact (bool, optional): Use arrow/categorical dtypes, see
+            jplearning.compact. Defaults to False.
 
     Returns:
         [pandas df]: See example.
@@ -132,9 +136,76 @@ def get_vocab_df(api_key, sync_vocab=False, type="kanji"):
             vocab_csv.subject_id == assignment.subject_id, "srs_stage"
         ] = assignment.srs_stage
 
+    if compact:
+        from jplearning.compact import compact_vocab_df
+
+        return compact_vocab_df(vocab_csv)
     return vocab_csv
 
 
+def write_if_changed(path, text: str):
+    """Write text to path, leaving its mtime alone if the content is the same."""
+    if os.path.exists(path):
+        with open(path) as f:
+            if f.read() == text:
+                return
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def fetched_age(path) -> float:
+    """Get seconds since path was last fetched, see write_fetched()."""
+    fetched_path = jpl.interim_dir() / "fetched.json"
+    if not os.path.exists(path) or not os.path.exists(fetched_path):
+        return float("inf")
+    with open(fetched_path) as f:
+        fetched = json.load(f)
+    return time.time() - fetched.get(str(path), float("-inf"))
+
+
+def write_fetched(path, text: str):
+    """Write fetched text with write_if_changed() and record the fetch time.
+
+    The time is kept in interim/fetched.json rather than the file mtime, so
+    a refetch with no changes does not look like a changed input.
+    """
+    write_if_changed(path, text)
+    fetched_path = jpl.interim_dir() / "fetched.json"
+    fetched = {}
+    if os.path.exists(fetched_path):
+        with open(fetched_path) as f:
+            fetched = json.load(f)
+    fetched[str(path)] = time.time()
+    with open(fetched_path, "w") as f:
+        json.dump(fetched, f, indent=2, sort_keys=True)
+
+
+def get_known_kanji(api_key, sync=False, sync_vocab=False, max_age=SYNC_TTL) -> set:
+    """Get set of kanji past the first SRS stage (srs_stage > 1).
+
+    Cached in external/wanikani/known_kanji.json, which is only rewritten
+    when the set changes.
+
+    Args:
+        api_key (str): wanikani api key
+        sync (bool, optional): Fetch SRS stages and update cache. Defaults to False.
+        sync_vocab (bool, optional): Also fetch kanji subjects, see
+            get_vocab_df(). Defaults to False.
+        max_age (float, optional): Refetch if the cache is older than this many
+            seconds. Defaults to SYNC_TTL.
+    """
+    wkpath = jpl.get_dir(jpl.external_dir() / "wanikani")
+    if sync or fetched_age(wkpath / "known_kanji.json") > max_age:
+        sync_vocab = sync_vocab or not os.path.exists(wkpath / "kanji.parquet")
+        wk_df = get_vocab_df(api_key, sync_vocab=sync_vocab, type="kanji")
+        known_kanji = sorted(wk_df[wk_df.srs_stage > 1].characters)
+        write_fetched(
+            wkpath / "known_kanji.json", json.dumps(known_kanji, ensure_ascii=False)
+        )
+    with open(wkpath / "known_kanji.json") as f:
+        return set(json.load(f))
+
+
 def filter_pos(df, str_filter):
     """Filter dataframe by part-of-speech.
 
@@ -208,8 +279,14 @@ def get_replacement_dict(template_str, pos_dict):
     return replacement_dict
 
 
-def get_sentence_db():
-    """Get sentences from ./data folder."""
+def get_sentence_db(compact=False):
+    """Get sentences from ./data folder.
+
+    Args:
+        compact (bool, optional): Use arrow/categorical dtypes and add
+            used_kanji as list<int32> ids, see jplearning.compact.
+            Defaults to False.
+    """
     # Read example sentences - Core6k
     core6k = pd.read_csv(
         jpl.external_dir() / "bunpro/core6k.txt", sep="\t", header=None
@@ -268,7 +345,49 @@ def get_sentence_db():
     jomako = pd.read_csv(jpl.external_dir() / "bunpro/jomako.csv")[["jp", "eng"]]
     jomako["source"] = "jomako"
 
-    return pd.concat([totoeba, core6k, jomako])
+    sentence_db = pd.concat([totoeba, core6k, jomako])
+    if compact:
+        from jplearning.compact import compact_sentence_db
+
+        return compact_sentence_db(sentence_db)
+    return sentence_db
+
+
+def get_corpus(rebuild=False):
+    """Get near-deduplicated, compact sentence DB.
+
+    Cached in processed/sentence_db.parquet, which is rebuilt when a source
+    file or sentence_grammar_mappings.csv is newer. Sentences used in
+    sentence_grammar_mappings.csv are never dropped by the dedupe.
+
+    Args:
+        rebuild (bool, optional): Rebuild cache from get_sentence_db().
+            Defaults to False.
+    """
+    path = jpl.processed_dir() / "sentence_db.parquet"
+    sources = [
+        jpl.external_dir() / "bunpro/{}".format(i)
+        for i in [
+            "core6k.txt",
+            "jomako.csv",
+            "tatoeba_jp.tsv",
+            "tatoeba_eng.tsv",
+            "tatoeba_links.csv",
+            "sentence_grammar_mappings.csv",
+        ]
+    ]
+    if (
+        rebuild
+        or not os.path.exists(path)
+        or any(
+            os.path.exists(i) and os.path.getmtime(i) > os.path.getmtime(path)
+            for i in sources
+        )
+    ):
+        sgm = pd.read_csv(jpl.external_dir() / "bunpro/sentence_grammar_mappings.csv")
+        sentence_db = dedupe_sentences(get_sentence_db(compact=True), keep=set(sgm.jp))
+        sentence_db.to_parquet(path, index=0, compression="gzip")
+    return pd.read_parquet(path, dtype_backend="pyarrow")
 
 
 def download_subject(id: int, verbose: int = 0):
@@ -302,6 +421,31 @@ def get_wk_user():
     return data.json()
 
 
+def get_grammar_points(bpkey, sync=False, max_age=SYNC_TTL) -> set:
+    """Get set of grammar points from recent bunpro items.
+
+    Cached in external/bunpro/grammar_points.json, which is only rewritten
+    when the set changes.
+
+    Args:
+        bpkey (str): bunpro api key
+        sync (bool, optional): Fetch from bunpro and update cache. Defaults to False.
+        max_age (float, optional): Refetch if the cache is older than this many
+            seconds. Defaults to SYNC_TTL.
+    """
+    path = jpl.external_dir() / "bunpro/grammar_points.json"
+    if sync or fetched_age(path) > max_age:
+        bpresp = requests.get(
+            "https://bunpro.jp/api/user/{}/recent_items".format(bpkey)
+        ).json()
+        grammar_points = sorted(
+            set([i["grammar_point"] for i in bpresp["requested_information"]])
+        )
+        write_fetched(path, json.dumps(grammar_points, ensure_ascii=False))
+    with open(path) as f:
+        return set(json.load(f))
+
+
 def assign_wklevel_to_kanji(kanjis: list):
     """Return a dict of wklevel assigned to a list of given kanji.
 
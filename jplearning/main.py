@@ -2,22 +2,17 @@
 import os
 
 import pandas as pd
-import requests
 
 import jplearning as jpl
+import jplearning.compact as jpc
 import jplearning.helpers as jph
 
 # %% Get WK DF
-# Only need to sync vocab once at the start, unless WaniKani updates its cards.
-wk_df = jph.get_vocab_df(os.getenv("WANIKANI"), sync_vocab=False, type="kanji")
-wk_df = wk_df[wk_df.srs_stage > 1]
-known_kanji = set(wk_df.characters.tolist())
+# Cached after the first fetch, refresh with `jplearning sync` (or sync=True).
+known_kanji = jph.get_known_kanji(os.getenv("WANIKANI"), sync=False)
 
 # %% Get Grammar Points
-bpkey = os.getenv("BUNPRO")
-bpresp = requests.get("https://bunpro.jp/api/user/{}/recent_items".format(bpkey))
-bpresp = bpresp.json()
-grammar_points = set([i["grammar_point"] for i in bpresp["requested_information"]])
+grammar_points = jph.get_grammar_points(os.getenv("BUNPRO"), sync=False)
 
 # %% Get Bunpro Sentences
 bpdf = pd.read_csv(jpl.external_dir() / "bunpro/bunpro.txt", sep="\t", header=None)
@@ -33,15 +28,12 @@ bpdf["hira"] = [i[0] for i in hira_roman]
 bpdf["roman"] = [i[1] for i in hira_roman]
 
 # %% Get Sentence DB (General)
-sentence_db = jph.get_sentence_db().reset_index(drop=True)
-sentence_db["used_kanji"] = sentence_db.jp.apply(lambda x: set(jph.get_kanji(x)))
-sentence_db["should_learn"] = sentence_db.used_kanji.apply(
-    lambda x: x.issubset(known_kanji)
-)
+# Near-deduplicated and compact, cached by `jplearning build-corpus`
+sentence_db = jph.get_corpus()
+sentence_db["should_learn"] = jpc.known_kanji_mask(sentence_db.used_kanji, known_kanji)
 sentence_db = sentence_db[sentence_db.should_learn]
 sentence_db["jp_len"] = sentence_db.jp.apply(len)
 sentence_db["kanji_len"] = sentence_db.used_kanji.apply(len)
-sentence_db = sentence_db.groupby("jp").head(1)
 
 # %% Sample sentences
 sample = sentence_db.sort_values("jp_len").head(10)
@@ -10,9 +10,8 @@ import jplearning.helpers as jph
 from jplearning.constants import ALL_POS, COLORS
 
 # Get WK DF
-wk_df = jph.get_vocab_df(os.getenv("WANIKANI"), type="kanji")
-wk_df = wk_df[wk_df.srs_stage > 1]
-known_kanji = set(wk_df.characters.tolist())
+# Cached after the first fetch, refresh with `jplearning sync` (or sync=True).
+known_kanji = jph.get_known_kanji(os.getenv("WANIKANI"), sync=False)
 lesson_glob = sorted(glob(str(jpl.external_dir() / "misa/*.csv")))
 df = pd.concat([pd.read_csv(i) for i in lesson_glob])
 jph.sanity_check_notes(df.japanese)
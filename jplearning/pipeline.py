@@ -0,0 +1,159 @@
+"""Cached pipeline of stages that only rerun when their inputs change."""
+
+import hashlib
+import json
+import time
+from glob import glob
+from pathlib import Path
+from typing import Callable, List
+
+import jplearning as jpl
+
+
+class Stage:
+    """A pipeline step.
+
+    Args:
+        name (str): Stage name
+        func (Callable): Called with no arguments to build outputs
+        inputs (list, optional): Input files or glob patterns. Defaults to [].
+        outputs (list, optional): Files written by func. Defaults to [].
+        deps (list, optional): Names of upstream stages. Defaults to [].
+        params (dict, optional): JSON-able values func depends on. Defaults to {}.
+        ttl (float, optional): Seconds a run stays fresh, for stages reading
+            remote state that no input file tracks. Defaults to None (forever).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        inputs: list = [],
+        outputs: list = [],
+        deps: list = [],
+        params: dict = {},
+        ttl: float = None,
+    ):
+        self.name = name
+        self.func = func
+        self.inputs = [str(i) for i in inputs]
+        self.outputs = [Path(i) for i in outputs]
+        self.deps = list(deps)
+        self.params = dict(params)
+        self.ttl = ttl
+
+
+def file_stamps(patterns: List[str]) -> list:
+    """Get (path, size, mtime) of each file matching patterns.
+
+    Missing files are stamped with None so creating them triggers a rebuild.
+    """
+    stamps = []
+    for pattern in patterns:
+        paths = sorted(glob(pattern)) or [pattern]
+        for path in paths:
+            p = Path(path)
+            if p.is_file():
+                stat = p.stat()
+                stamps.append([path, stat.st_size, stat.st_mtime_ns])
+            else:
+                stamps.append([path, None, None])
+    return stamps
+
+
+class Pipeline:
+    """DAG of stages, with fingerprints cached in a json state file.
+
+    A stage is skipped when its fingerprint (input file stamps, params and
+    upstream fingerprints) matches the cached one, its outputs exist and its
+    ttl, if any, has not expired.
+
+    Example:
+    pl = Pipeline()
+    pl.add(Stage("corpus", build, inputs=["a.csv"], outputs=["corpus.parquet"]))
+    pl.run("corpus")
+    """
+
+    def __init__(self, state_path=None):
+        self.stages = {}
+        self.state_path = Path(state_path or jpl.interim_dir() / "pipeline_state.json")
+        if self.state_path.exists():
+            with open(self.state_path) as f:
+                self.state = json.load(f)
+        else:
+            self.state = {}
+
+    def add(self, stage: Stage):
+        """Register a stage."""
+        self.stages[stage.name] = stage
+
+    def order(self, target: str) -> List[str]:
+        """Get stage names needed for target, upstream first."""
+        order, visiting = [], set()
+
+        def visit(name):
+            if name in order:
+                return
+            assert name not in visiting, "Cycle at stage: {}".format(name)
+            assert name in self.stages, "Unknown stage: {}".format(name)
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.remove(name)
+            order.append(name)
+
+        visit(target)
+        return order
+
+    def fingerprint(self, name: str, fingerprints: dict) -> str:
+        """Hash stage inputs, params and upstream fingerprints."""
+        stage = self.stages[name]
+        key = {
+            "inputs": file_stamps(stage.inputs),
+            "params": stage.params,
+            "deps": [fingerprints[d] for d in stage.deps],
+        }
+        return hashlib.sha256(
+            json.dumps(key, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    def run(self, target: str, force: set = set(), verbose: int = 1) -> dict:
+        """Run target and its upstream stages, skipping unchanged ones.
+
+        Args:
+            target (str): Stage name
+            force (set, optional): Stage names to rerun regardless of cache.
+            verbose (int, optional): Print stage status. Defaults to 1.
+
+        Returns:
+            [dict]: Stage name to "ran" or "cached"
+        """
+        fingerprints, status = {}, {}
+        for name in self.order(target):
+            stage = self.stages[name]
+            fp = self.fingerprint(name, fingerprints)
+            last = self.state.get(name, {})
+            cached = (
+                name not in force
+                and last.get("fingerprint") == fp
+                and all(o.exists() for o in stage.outputs)
+                and (stage.ttl is None or time.time() - last["time"] < stage.ttl)
+            )
+            if cached:
+                if verbose > 0:
+                    print("Skipping stage {} (unchanged)".format(name))
+                status[name] = "cached"
+            else:
+                if verbose > 0:
+                    print("Running stage {}".format(name))
+                stage.func()
+                self.state[name] = {"fingerprint": fp, "time": time.time()}
+                self.save()
+                status[name] = "ran"
+            fingerprints[name] = fp
+        return status
+
+    def save(self):
+        """Write cached fingerprints to the state file."""
+        with open(self.state_path, "w") as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
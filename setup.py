@@ -1,3 +1,8 @@
 from setuptools import find_packages, setup
 
-setup(name="jplearning", version="1.0", packages=find_packages())
+setup(
+    name="jplearning",
+    version="1.0",
+    packages=find_packages(),
+    entry_points={"console_scripts": ["jplearning=jplearning.cli:main"]},
+)